@@ -79,13 +79,12 @@ def read_root():
 
 @app.get("/health")
 @app.head("/health")
-def health_check():
+async def health_check():
     """
     Health check endpoint for Wardroberry API
     Checks: Redis, Celery, Supabase DB, Supabase Storage, OpenAI
     """
-    from src.database_manager import DatabaseManager
-    from src.storage_manager import StorageManager
+    from src.database_manager import get_anon_database_manager
     from src.queue_manager import QueueManager
     from src.ai import ClothingAI
 
@@ -94,40 +93,29 @@ def health_check():
         "services": {}
     }
 
-    # Check Redis
-    try:
-        health_status["services"]["redis"] = check_redis_connection()
-    except Exception as e:
-        health_status["services"]["redis"] = False
-        health_status["status"] = "degraded"
+    checks = {
+        "redis": check_redis_connection,
+        "celery": lambda: QueueManager().health_check(),
+        "database": lambda: get_anon_database_manager().health_check(),
+        "openai": lambda: ClothingAI().health_check(),
+    }
 
-    # Check Celery/Queue
-    try:
-        queue = QueueManager()
-        health_status["services"]["celery"] = queue.health_check()
-    except Exception as e:
-        health_status["services"]["celery"] = False
-        health_status["status"] = "degraded"
+    # Run the blocking checks concurrently, so latency is the slowest check instead of the sum
+    results = await asyncio.gather(
+        *(asyncio.to_thread(check) for check in checks.values()),
+        return_exceptions=True
+    )
 
-    # Check Supabase Database
-    try:
-        db = DatabaseManager()
-        health_status["services"]["database"] = db.health_check()
-    except Exception as e:
-        health_status["services"]["database"] = False
-        health_status["status"] = "degraded"
+    for service, result in zip(checks, results):
+        if isinstance(result, Exception):
+            health_status["services"][service] = False
+            health_status["status"] = "degraded"
+        else:
+            health_status["services"][service] = result
 
     # Storage health check skipped (requires user authentication)
     health_status["services"]["storage"] = "auth_required"
 
-    # Check OpenAI
-    try:
-        ai = ClothingAI()
-        health_status["services"]["openai"] = ai.health_check()
-    except Exception as e:
-        health_status["services"]["openai"] = False
-        health_status["status"] = "degraded"
-
     return health_status
 
 @app.get("/rate_limit_test")
@@ -152,4 +140,4 @@ def check_redis_connection():
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, ws_per_message_deflate=False)
\ No newline at end of file
@@ -0,0 +1,18 @@
+-- Migration: Aggregated clothes statistics per user
+-- GET /stats needs exact per-status and per-category counts; selecting rows is capped by
+-- PostgREST's max-rows, so the grouping happens in Postgres and only the groups are returned
+
+-- SECURITY INVOKER: runs with the caller's RLS, so users only ever count their own rows
+CREATE OR REPLACE FUNCTION clothes_statistics(p_user_id uuid)
+RETURNS TABLE (processing_status varchar, category text, item_count bigint)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  SELECT c.processing_status, c.category::text, count(*) AS item_count
+  FROM clothes c
+  WHERE c.user_id = p_user_id
+  GROUP BY c.processing_status, c.category;
+$$;
+
+GRANT EXECUTE ON FUNCTION clothes_statistics(uuid) TO authenticated;
@@ -0,0 +1,10 @@
+-- Migration: Composite indexes for per-user clothes queries
+-- Status/category filters and statistics are evaluated in Postgres, always scoped to one user
+
+-- GET /clothes?status=..., /stats and status updates filter by user + processing_status
+CREATE INDEX IF NOT EXISTS idx_clothes_user_status
+ON clothes(user_id, processing_status);
+
+-- GET /clothes lists a user's items newest first
+CREATE INDEX IF NOT EXISTS idx_clothes_user_created_at
+ON clothes(user_id, created_at DESC);
@@ -1,12 +1,124 @@
 import os
+import io
 import logging
-import base64
-from typing import Dict, Any, Optional
-from openai import OpenAI
-from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Dict, Any, Optional, Union
+import orjson
+import pybase64
+import redis
+from PIL import Image
+from openai import OpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from src.config import config  # lädt .env einmalig beim Import
+
+# Modell für die Kleidungsanalyse
+ANALYSIS_MODEL = "gpt-4o-mini"
+
+# System-Prompt für die Kleidungsanalyse (ohne Einrückung, spart Tokens)
+ANALYSIS_SYSTEM_PROMPT = """\
+Du bist ein Experte für Kleidung und Mode. Analysiere das hochgeladene Bild eines Kleidungsstücks und gib die Informationen in folgendem JSON-Format zurück:
+
+{
+    "category": "Kategorie des Kleidungsstücks",
+    "color": "Hauptfarbe",
+    "style": "Stil des Kleidungsstücks",
+    "season": "Passende Saison",
+    "material": "Vermutetes Material",
+    "occasion": "Geeigneter Anlass",
+    "confidence": "Vertrauenswert der Analyse (0-1)"
+}
+
+Kategorien: Oberteil, Hose, Kleid, Rock, Jacke, Schuhe, Accessoire
+(Oberteil = T-Shirt, Hemd, Bluse, Pullover, etc.)
+
+Farben: schwarz, weiß, grau, braun, beige, rot, rosa, orange, gelb, grün, blau, lila, bunt, gemustert
+
+Stile: casual, elegant, sportlich, business, vintage, modern, bohemian, minimalistisch, extravagant
+
+Saisons: Frühling, Sommer, Herbst, Winter, Ganzjährig, Übergangszeit
+
+Anlässe: Alltag, Arbeit, Sport, Freizeit, Ausgehen, Formal, Strand, Zuhause
+
+Antworte NUR mit dem JSON-Objekt, ohne zusätzlichen Text.
+"""
+
+# Erlaubte Werte (nur Haupt-Kategorien die DB erlaubt)
+ALLOWED_CATEGORIES = frozenset({
+    "Oberteil", "Hose", "Kleid", "Rock", "Jacke", "Schuhe", "Accessoire"
+})
+
+ALLOWED_COLORS = frozenset({
+    "schwarz", "weiß", "grau", "braun", "beige", "rot", "rosa", "orange",
+    "gelb", "grün", "blau", "lila", "bunt", "gemustert"
+})
+
+ALLOWED_STYLES = frozenset({
+    "casual", "elegant", "sportlich", "business", "vintage", "modern",
+    "bohemian", "minimalistisch", "extravagant"
+})
+
+ALLOWED_SEASONS = frozenset({
+    "Frühling", "Sommer", "Herbst", "Winter", "Ganzjährig", "Übergangszeit"
+})
+
+# Vorübergehende OpenAI-Fehler: werden nicht mit einem Fallback verschluckt,
+# sondern an den Celery Task weitergereicht (Retry mit Backoff)
+TRANSIENT_OPENAI_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+# Anzahl automatischer Retries des OpenAI Clients (exponentielles Backoff mit Jitter)
+OPENAI_MAX_RETRIES = 5
+
+# Redis Cache für Analyseergebnisse (Version im Prefix invalidiert bei Schema-Änderungen)
+ANALYSIS_CACHE_PREFIX = "clothing_ai:v3"
+ANALYSIS_CACHE_TTL = 86400 * 7  # 7 Tage
+
+# Analysebild verkleinern bevor es an die Vision API geht (weniger Upload und Tokens)
+ANALYSIS_IMAGE_MAX_SIDE = 512  # entspricht dem "low"-Detail Tile der Vision API
+ANALYSIS_IMAGE_QUALITY = 80
+
+# Magic Bytes -> MIME-Type für data: URLs (extrahierte Bilder sind PNG, Uploads meist JPEG)
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', "image/png"),
+    (b'\xff\xd8\xff', "image/jpeg"),
+    (b'GIF8', "image/gif"),
+)
+
+_cache_client: Optional[redis.Redis] = None
+
+
+def get_cache_client() -> redis.Redis:
+    """Gibt den prozessweiten Redis Client für den Analyse-Cache zurück"""
+    global _cache_client
+    if _cache_client is None:
+        _cache_client = redis.from_url(config.redis_url)
+    return _cache_client
+
+
+@lru_cache(maxsize=None)
+def get_openai_client(api_key: str) -> OpenAI:
+    """Gibt einen prozessweiten OpenAI Client pro API Key zurück (Connection-Pool wird wiederverwendet)"""
+    return OpenAI(api_key=api_key, max_retries=OPENAI_MAX_RETRIES)
+
+
+def image_data_url(image_content: bytes) -> str:
+    """
+    Kodiert Bilddaten in einem Schritt als data: URL für die OpenAI API
+
+    Args:
+        image_content: Binärdaten des Bildes
+
+    Returns:
+        data: URL mit passendem MIME-Type
+    """
+    mime_type = "image/jpeg"
+    for signature, signature_mime in IMAGE_SIGNATURES:
+        if image_content.startswith(signature):
+            mime_type = signature_mime
+            break
+    else:
+        if image_content[:4] == b'RIFF' and image_content[8:12] == b'WEBP':
+            mime_type = "image/webp"
+    return f"data:{mime_type};base64,{pybase64.b64encode_as_string(image_content)}"
 
-# Load environment variables
-load_dotenv()
 
 class ClothingAI:
     """
@@ -25,58 +137,39 @@ class ClothingAI:
         if not self.api_key:
             raise ValueError("OpenAI API Key muss gesetzt sein")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = get_openai_client(self.api_key)
         self.logger = logging.getLogger(__name__)
     
-    def analyze_clothing_image(self, image_content: bytes) -> Dict[str, Any]:
+    def analyze_clothing_image(self, image_content: bytes, cache_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Analysiert ein Kleidungsstück-Bild mit OpenAI Vision API
         
         Args:
             image_content: Binärdaten des Bildes
+            cache_id: Inhalts-Hash des hochgeladenen Originalbildes. Das extrahierte
+                      Bild ist bei jedem Lauf neu generiert, deshalb wird nur mit
+                      dieser Kennung gecacht (ohne: kein Cache)
             
         Returns:
             Dict mit erkannten Eigenschaften des Kleidungsstücks
         """
-        try:
-            # Bild zu Base64 konvertieren
-            image_base64 = base64.b64encode(image_content).decode('utf-8')
-            
-            # Prompt für Kleidungsanalyse
-            system_prompt = """
-            Du bist ein Experte für Kleidung und Mode. Analysiere das hochgeladene Bild eines Kleidungsstücks und gib die Informationen in folgendem JSON-Format zurück:
-
-            {
-                "category": "Kategorie des Kleidungsstücks",
-                "color": "Hauptfarbe",
-                "style": "Stil des Kleidungsstücks", 
-                "season": "Passende Saison",
-                "material": "Vermutetes Material",
-                "occasion": "Geeigneter Anlass",
-                "confidence": "Vertrauenswert der Analyse (0-1)"
-            }
-
-            Kategorien: Oberteil, Hose, Kleid, Rock, Jacke, Schuhe, Accessoire
-            (Oberteil = T-Shirt, Hemd, Bluse, Pullover, etc.)
-
-            Farben: schwarz, weiß, grau, braun, beige, rot, rosa, orange, gelb, grün, blau, lila, bunt, gemustert
-
-            Stile: casual, elegant, sportlich, business, vintage, modern, bohemian, minimalistisch, extravagant
+        cache_key = self._analysis_cache_key(cache_id) if cache_id else None
+        cached_result = self._get_cached_analysis(cache_key) if cache_key else None
+        if cached_result:
+            self.logger.info(f"Kleidungsanalyse aus Cache: {cached_result['category']}")
+            return cached_result
 
-            Saisons: Frühling, Sommer, Herbst, Winter, Ganzjährig, Übergangszeit
-
-            Anlässe: Alltag, Arbeit, Sport, Freizeit, Ausgehen, Formal, Strand, Zuhause
-
-            Antworte NUR mit dem JSON-Objekt, ohne zusätzlichen Text.
-            """
+        try:
+            # Verkleinertes Bild als data: URL kodieren
+            image_url = image_data_url(self._prepare_analysis_image(image_content))
             
             # API-Aufruf
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=ANALYSIS_MODEL,
                 messages=[
                     {
                         "role": "system",
-                        "content": system_prompt
+                        "content": ANALYSIS_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -88,46 +181,90 @@ class ClothingAI:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_base64}",
-                                    "detail": "high"
+                                    "url": image_url,
+                                    "detail": "low"  # Pauschal 85 Bild-Tokens statt Kachel-Abrechnung
                                 }
                             }
                         ]
                     }
                 ],
                 max_tokens=500,
-                temperature=0.3
+                temperature=0.3,
+                response_format={"type": "json_object"}  # Garantiert reines JSON ohne Code-Fences
             )
             
             # Response verarbeiten
-            content = response.choices[0].message.content.strip()
-
-            # JSON parsen (entferne Markdown code blocks falls vorhanden)
-            import json
-            import re
-
-            # Entferne ```json ... ``` oder ``` ... ``` falls vorhanden
-            content = re.sub(r'^```(?:json)?\s*\n', '', content)
-            content = re.sub(r'\n```\s*$', '', content)
-            content = content.strip()
+            content = response.choices[0].message.content
 
             try:
-                analysis_result = json.loads(content)
+                analysis_result = orjson.loads(content)
                 
                 # Validierung und Defaults
                 result = self._validate_and_normalize_result(analysis_result)
+                if cache_key:
+                    self._cache_analysis(cache_key, result)
                 
                 self.logger.info(f"Kleidungsanalyse erfolgreich: {result['category']}")
                 return result
                 
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 self.logger.error(f"Konnte AI-Response nicht als JSON parsen: {content}")
                 return self._get_fallback_result()
                 
+        except TRANSIENT_OPENAI_ERRORS as e:
+            self.logger.warning(f"Vorübergehender OpenAI-Fehler bei der Kleidungsanalyse: {e}")
+            raise
         except Exception as e:
             self.logger.error(f"Fehler bei der Kleidungsanalyse: {e}")
             return self._get_fallback_result()
     
+    def _prepare_analysis_image(self, image_content: bytes) -> bytes:
+        """
+        Verkleinert das Bild für die Analyse und kodiert es als WebP
+
+        Args:
+            image_content: Binärdaten des Bildes
+
+        Returns:
+            Verkleinerte Bilddaten (oder Originaldaten falls nicht lesbar)
+        """
+        try:
+            with Image.open(io.BytesIO(image_content)) as image:
+                image.thumbnail((ANALYSIS_IMAGE_MAX_SIDE, ANALYSIS_IMAGE_MAX_SIDE))
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGB")
+                buffer = io.BytesIO()
+                image.save(buffer, format="WEBP", quality=ANALYSIS_IMAGE_QUALITY)
+            return buffer.getvalue()
+        except Exception as e:
+            self.logger.warning(f"Analysebild konnte nicht verkleinert werden: {e}")
+            return image_content
+
+    def _analysis_cache_key(self, cache_id: str) -> str:
+        """Erzeugt den Cache-Key aus Modell und Inhalts-Hash des Originalbildes"""
+        return f"{ANALYSIS_CACHE_PREFIX}:{ANALYSIS_MODEL}:{cache_id}"
+
+    def _get_cached_analysis(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Holt ein gecachtes Analyseergebnis aus Redis
+
+        Returns:
+            Analyseergebnis oder None (Cache-Fehler werden nur geloggt)
+        """
+        try:
+            cached = get_cache_client().get(cache_key)
+            return orjson.loads(cached) if cached else None
+        except Exception as e:
+            self.logger.warning(f"Analyse-Cache nicht lesbar: {e}")
+            return None
+
+    def _cache_analysis(self, cache_key: str, result: Dict[str, Any]):
+        """Speichert ein Analyseergebnis in Redis"""
+        try:
+            get_cache_client().set(cache_key, orjson.dumps(result), ex=ANALYSIS_CACHE_TTL)
+        except Exception as e:
+            self.logger.warning(f"Analyse-Cache nicht beschreibbar: {e}")
+    
     def _validate_and_normalize_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Validiert und normalisiert das AI-Analyseergebnis
@@ -138,54 +275,32 @@ class ClothingAI:
         Returns:
             Validiertes und normalisiertes Ergebnis
         """
-        # Erlaubte Werte definieren (nur Haupt-Kategorien die DB erlaubt)
-        allowed_categories = [
-            "Oberteil", "Hose", "Kleid", "Rock", "Jacke", "Schuhe", "Accessoire"
-        ]
-        
-        allowed_colors = [
-            "schwarz", "weiß", "grau", "braun", "beige", "rot", "rosa", "orange", 
-            "gelb", "grün", "blau", "lila", "bunt", "gemustert"
-        ]
-        
-        allowed_styles = [
-            "casual", "elegant", "sportlich", "business", "vintage", "modern", 
-            "bohemian", "minimalistisch", "extravagant"
-        ]
-        
-        allowed_seasons = [
-            "Frühling", "Sommer", "Herbst", "Winter", "Ganzjährig", "Übergangszeit"
-        ]
-        
-        # Validierung mit Fallbacks
-        validated_result = {
-            "category": result.get("category", "Oberteil"),
-            "color": result.get("color", "unbekannt"),
-            "style": result.get("style", "casual"),
-            "season": result.get("season", "Ganzjährig"),
+        category = result.get("category")
+        color = result.get("color")
+        style = result.get("style")
+        season = result.get("season")
+
+        # Validierung mit Fallbacks in einem Durchgang
+        return {
+            "category": self._allowed_or_default(category, ALLOWED_CATEGORIES, "Oberteil"),
+            "color": self._allowed_or_default(color, ALLOWED_COLORS, "unbekannt"),
+            "style": self._allowed_or_default(style, ALLOWED_STYLES, "casual"),
+            "season": self._allowed_or_default(season, ALLOWED_SEASONS, "Ganzjährig"),
             "material": result.get("material", "unbekannt"),
             "occasion": result.get("occasion", "Alltag"),
             "confidence": float(result.get("confidence", 0.8))
         }
-        
-        # Kategorie validieren
-        if validated_result["category"] not in allowed_categories:
-            validated_result["category"] = "Oberteil"
-        
-        # Farbe validieren
-        if validated_result["color"] not in allowed_colors:
-            validated_result["color"] = "unbekannt"
-            
-        # Stil validieren
-        if validated_result["style"] not in allowed_styles:
-            validated_result["style"] = "casual"
-            
-        # Saison validieren
-        if validated_result["season"] not in allowed_seasons:
-            validated_result["season"] = "Ganzjährig"
-        
-        return validated_result
     
+    @staticmethod
+    def _allowed_or_default(value: Any, allowed: frozenset, default: str) -> str:
+        """
+        Gibt den Wert zurück, wenn er erlaubt ist, sonst den Standardwert
+
+        Nur Strings werden nachgeschlagen: Listen/Objekte aus der JSON-Antwort sind
+        nicht hashbar und würden sonst die gesamte Analyse verwerfen
+        """
+        return value if isinstance(value, str) and value in allowed else default
+
     def _get_fallback_result(self) -> Dict[str, Any]:
         """
         Gibt ein Standard-Ergebnis zurück falls die AI-Analyse fehlschlägt
@@ -206,22 +321,22 @@ class ClothingAI:
     
     def encode_image(self, image_path):
         with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+            return pybase64.b64encode_as_string(image_file.read())
 
-    def extract_clothing(self, image_content: bytes) -> bytes:
+    def extract_clothing(self, image: Union[bytes, str]) -> bytes:
         """
         Extrahiert Kleidungsstücke aus einem Bild mit OpenAI Responses API
         Verwendet image_generation tool um das Kleidungsstück auf weißem Hintergrund zu generieren
 
         Args:
-            image_content: Binärdaten des Bildes
+            image: Binärdaten des Bildes oder eine (signierte) URL, die OpenAI selbst abruft
 
         Returns:
             bytes: Generiertes Bild als PNG-Bytes
         """
         try:
-            # Eingehende Bildbytes in Base64 konvertieren
-            base64_image = base64.b64encode(image_content).decode("utf-8")
+            # URLs direkt weitergeben (kein Base64 im Request), Bildbytes als data: URL kodieren
+            image_url = image if isinstance(image, str) else image_data_url(image)
 
             prompt = "Erstelle ein fotorealistisches Bild des Kleidungsstücks aus dem Referenzbild, isoliert auf weißem Hintergrund. Entferne den Hintergrund und zeige nur das Kleidungsstück."
 
@@ -234,7 +349,7 @@ class ClothingAI:
                             {"type": "input_text", "text": prompt},
                             {
                                 "type": "input_image",
-                                "image_url": f"data:image/jpeg;base64,{base64_image}",
+                                "image_url": image_url,
                             },
                         ],
                     }
@@ -254,7 +369,7 @@ class ClothingAI:
             if image_generation_calls:
                 # Das generierte Bild ist in base64 im result
                 generated_image_base64 = image_generation_calls[0].result
-                generated_image_bytes = base64.b64decode(generated_image_base64)
+                generated_image_bytes = pybase64.b64decode(generated_image_base64)
 
                 self.logger.info(f"Kleidungsstück erfolgreich extrahiert ({len(generated_image_bytes)} bytes)")
                 return generated_image_bytes
@@ -272,12 +387,8 @@ class ClothingAI:
             True wenn API erreichbar ist
         """
         try:
-            # Einfacher Test-Call zur OpenAI API
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": "Hallo"}],
-                max_tokens=5
-            )
+            # Leichtgewichtiger Test-Call ohne Token-Verbrauch
+            self.client.models.retrieve(ANALYSIS_MODEL)
             return True
             
         except Exception as e:
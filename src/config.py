@@ -2,6 +2,7 @@
 Configuration management for Wardroberry API
 """
 import os
+from urllib.parse import urlsplit, parse_qsl, urlencode
 from dotenv import load_dotenv
 from src.helper.exceptions import ConfigurationError
 
@@ -45,11 +46,40 @@ class Config:
 
     @property
     def redis_url(self) -> str:
-        """Get Redis URL (for backwards compatibility)"""
+        """
+        Get Redis URL
+
+        REDIS_URL takes precedence, e.g. unix:///var/run/redis/redis.sock?db=0
+        for a co-located Redis. Otherwise the URL is built from REDIS_HOST etc.
+        """
+        url = os.getenv('REDIS_URL')
+        if url:
+            return url
         if self.redis_password:
             return f"redis://:{self.redis_password}@{self.redis_host}:{self.redis_port}/{self.redis_db}"
         return f"redis://{self.redis_host}:{self.redis_port}/{self.redis_db}"
 
+    @property
+    def celery_redis_url(self) -> str:
+        """
+        Get Redis URL for the Celery broker and result backend
+
+        kombu does not understand redis-py's unix:// scheme; a socket URL
+        (unix:///path/redis.sock?db=0) is translated to the equivalent
+        redis+socket:///path/redis.sock?virtual_host=0 form.
+        """
+        url = self.redis_url
+        parts = urlsplit(url)
+        if parts.scheme != 'unix':
+            return url
+
+        query = dict(parse_qsl(parts.query))
+        db = query.pop('db', None)
+        if db is not None:
+            query['virtual_host'] = db
+        celery_url = f"redis+socket://{parts.netloc}{parts.path}"
+        return f"{celery_url}?{urlencode(query)}" if query else celery_url
+
     @property
     def supabase_jwt_secret(self) -> str:
         """Get Supabase JWT secret"""
@@ -1,5 +1,6 @@
 import os
 import logging
+from functools import lru_cache
 from typing import Optional, List, Dict, Any, Union
 from datetime import datetime, timezone
 from supabase import create_client, Client
@@ -68,13 +69,14 @@ class DatabaseManager:
             Dict mit den erstellten Nutzerdaten
         """
         try:
+            now = datetime.now(timezone.utc).isoformat()
             data = {
                 'id': user_id,
                 'email': email,
                 'first_name': first_name,
                 'last_name': last_name,
-                'created_at': datetime.now(timezone.utc).isoformat(),
-                'updated_at': datetime.now(timezone.utc).isoformat()
+                'created_at': now,
+                'updated_at': now
             }
             
             result = self.client.table('users').insert(data).execute()
@@ -163,12 +165,13 @@ class DatabaseManager:
             String mit der ID des erstellten Kleidungsstücks
         """
         try:
+            now = datetime.now(timezone.utc).isoformat()
             data = {
                 'user_id': user_id,
                 'image_url': original_image_url,
                 'category': 'Wird analysiert...',  # Placeholder
-                'created_at': datetime.now(timezone.utc).isoformat(),
-                'updated_at': datetime.now(timezone.utc).isoformat()
+                'created_at': now,
+                'updated_at': now
             }
 
             # Add optional filename if provided
@@ -219,6 +222,39 @@ class DatabaseManager:
             self.logger.error(f"Fehler beim Aktualisieren des Status: {e}")
             raise
     
+    def claim_clothing_for_processing(self, clothing_id: str) -> bool:
+        """
+        Setzt ein Kleidungsstück auf PROCESSING, sofern es noch nicht fertig verarbeitet ist
+        
+        Args:
+            clothing_id: UUID des Kleidungsstücks
+            
+        Returns:
+            True wenn die Verarbeitung starten soll, False wenn bereits abgeschlossen (oder nicht vorhanden)
+        """
+        try:
+            data = {
+                'processing_status': ProcessingStatus.PROCESSING.value,
+                'updated_at': datetime.now(timezone.utc).isoformat()
+            }
+            
+            # Bedingtes Update: ein Roundtrip statt Status lesen + schreiben
+            result = self.client.table('clothes').update(data)\
+                .eq('id', clothing_id)\
+                .neq('processing_status', ProcessingStatus.COMPLETED.value)\
+                .execute()
+            
+            if not result.data:
+                self.logger.info(f"Kleidungsstück {clothing_id} bereits verarbeitet oder nicht gefunden")
+                return False
+            
+            self.logger.info(f"Status aktualisiert für {clothing_id}: {ProcessingStatus.PROCESSING.value}")
+            return True
+            
+        except APIError as e:
+            self.logger.error(f"Fehler beim Aktualisieren des Status: {e}")
+            raise
+    
     def complete_clothing_processing(self, clothing_id: str, 
                                    extracted_image_url: str = None,
                                    category: str = None, color: str = None, 
@@ -387,6 +423,7 @@ class DatabaseManager:
             Dict mit den Kleidungsdaten
         """
         try:
+            now = datetime.now(timezone.utc).isoformat()
             data = {
                 'user_id': user_id,
                 'image_url': image_url,
@@ -395,8 +432,8 @@ class DatabaseManager:
                 'style': style,
                 'season': season,
                 'processing_status': ProcessingStatus.COMPLETED.value,  # Direkt completed wenn manuell hinzugefügt
-                'created_at': datetime.now(timezone.utc).isoformat(),
-                'updated_at': datetime.now(timezone.utc).isoformat()
+                'created_at': now,
+                'updated_at': now
             }
             
             result = self.client.table('clothes').insert(data).execute()
@@ -408,7 +445,8 @@ class DatabaseManager:
             raise
     
     def get_user_clothes(self, user_id: str, category: str = None, 
-                        season: str = None, style: str = None) -> List[Dict[str, Any]]:
+                        season: str = None, style: str = None,
+                        status: ProcessingStatus = None) -> List[Dict[str, Any]]:
         """
         Holt alle Kleidungsstücke eines Nutzers mit optionalen Filtern
         
@@ -417,6 +455,7 @@ class DatabaseManager:
             category: Filtert nach Kategorie (optional)
             season: Filtert nach Saison (optional)
             style: Filtert nach Stil (optional)
+            status: Filtert nach ProcessingStatus (optional)
             
         Returns:
             Liste mit Kleidungsstücken
@@ -430,6 +469,8 @@ class DatabaseManager:
                 query = query.eq('season', season)
             if style:
                 query = query.eq('style', style)
+            if status:
+                query = query.eq('processing_status', status.value)
                 
             result = query.order('created_at', desc=True).execute()
             return result.data or []
@@ -562,12 +603,17 @@ class DatabaseManager:
             Liste mit Outfits
         """
         try:
-            result = self.client.table('outfits').select('*').eq('user_id', user_id).order('created_at', desc=True).execute()
+            # Kleidungsstücke per Embedded Select in derselben Abfrage laden (statt eine Abfrage pro Outfit)
+            columns = '*, outfit_items(clothes(*))' if include_items else '*'
+            result = self.client.table('outfits').select(columns).eq('user_id', user_id).order('created_at', desc=True).execute()
             outfits = result.data or []
             
             if include_items:
                 for outfit in outfits:
-                    outfit['items'] = self.get_outfit_items(outfit['id'])
+                    outfit['items'] = [
+                        item['clothes'] for item in outfit.pop('outfit_items', None) or []
+                        if item.get('clothes')
+                    ]
             
             return outfits
             
@@ -670,13 +716,16 @@ class DatabaseManager:
             Liste mit erstellten outfit_items
         """
         try:
-            items_data = []
-            for clothing_id in clothing_ids:
-                items_data.append({
+            # Ein Zeitstempel für alle Einträge des Batches
+            now = datetime.now(timezone.utc).isoformat()
+            items_data = [
+                {
                     'outfit_id': outfit_id,
                     'clothing_id': clothing_id,
-                    'created_at': datetime.now(timezone.utc).isoformat()
-                })
+                    'created_at': now
+                }
+                for clothing_id in clothing_ids
+            ]
             
             result = self.client.table('outfit_items').insert(items_data).execute()
             self.logger.info(f"{len(clothing_ids)} Kleidungsstücke zu Outfit {outfit_id} hinzugefügt")
@@ -773,45 +822,28 @@ class DatabaseManager:
             Dict mit Kleidungsstück-Statistiken
         """
         try:
-            # Anzahl Kleidungsstücke gesamt
-            clothes_result = self.client.table('clothes').select('id', count='exact').eq('user_id', user_id).execute()
-            total_count = clothes_result.count or 0
-
-            # Anzahl nach Processing-Status
-            completed_result = self.client.table('clothes').select('id', count='exact')\
-                .eq('user_id', user_id)\
-                .eq('processing_status', ProcessingStatus.COMPLETED.value)\
-                .execute()
-            completed_count = completed_result.count or 0
-
-            processing_result = self.client.table('clothes').select('id', count='exact')\
-                .eq('user_id', user_id)\
-                .eq('processing_status', ProcessingStatus.PROCESSING.value)\
-                .execute()
-            processing_count = processing_result.count or 0
-
-            pending_result = self.client.table('clothes').select('id', count='exact')\
-                .eq('user_id', user_id)\
-                .eq('processing_status', ProcessingStatus.PENDING.value)\
-                .execute()
-            pending_count = pending_result.count or 0
-
-            failed_result = self.client.table('clothes').select('id', count='exact')\
-                .eq('user_id', user_id)\
-                .eq('processing_status', ProcessingStatus.FAILED.value)\
-                .execute()
-            failed_count = failed_result.count or 0
+            # Gruppierung in Postgres (migrations/add_clothes_statistics_function.sql):
+            # exakte Zahlen unabhängig vom PostgREST Zeilenlimit, nur die Gruppen werden übertragen
+            stats_result = self.client.rpc('clothes_statistics', {'p_user_id': user_id}).execute()
 
+            total_count = 0
+            status_counts = {status.value: 0 for status in ProcessingStatus}
             # Kategorien-Verteilung (nur completed items)
-            categories_result = self.client.table('clothes').select('category')\
-                .eq('user_id', user_id)\
-                .eq('processing_status', ProcessingStatus.COMPLETED.value)\
-                .execute()
             categories = {}
-            for item in categories_result.data or []:
-                category = item['category']
-                if category and category != 'Wird analysiert...':
-                    categories[category] = categories.get(category, 0) + 1
+            for row in stats_result.data or []:
+                status = row['processing_status']
+                item_count = row['item_count']
+                total_count += item_count
+                status_counts[status] = status_counts.get(status, 0) + item_count
+                if status == ProcessingStatus.COMPLETED.value:
+                    category = row['category']
+                    if category and category != 'Wird analysiert...':
+                        categories[category] = categories.get(category, 0) + item_count
+
+            completed_count = status_counts[ProcessingStatus.COMPLETED.value]
+            processing_count = status_counts[ProcessingStatus.PROCESSING.value]
+            pending_count = status_counts[ProcessingStatus.PENDING.value]
+            failed_count = status_counts[ProcessingStatus.FAILED.value]
 
             return {
                 'total_clothes': total_count,
@@ -905,3 +937,14 @@ class DatabaseManager:
         except APIError as e:
             self.logger.error(f"Fehler beim Laden der Kategorien: {e}")
             raise
+
+
+@lru_cache(maxsize=1)
+def get_anon_database_manager() -> DatabaseManager:
+    """
+    Prozessweiter DatabaseManager ohne User Token (z.B. für Health Checks)
+    
+    Returns:
+        Geteilter DatabaseManager mit ANON_KEY (Connection-Pool wird wiederverwendet)
+    """
+    return DatabaseManager()
@@ -1,21 +1,25 @@
 from typing import Union
 from fastapi import Request, Response
-from fastapi.responses import JSONResponse
+import orjson
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Constant 429 body, serialized once at import
+RATE_LIMIT_RESPONSE_BODY = orjson.dumps({
+    "status": "FAILURE",
+    "error_code": "RATE_LIMIT_EXCEEDED",
+    "should_refund": False,
+    "technical_details": "Too many requests. Please try again later."
+})
+
 def rate_limit_handler(request: Request, exc: Union[RateLimitExceeded, Exception]) -> Response:
-    return JSONResponse(
+    return Response(
+        content=RATE_LIMIT_RESPONSE_BODY,
         status_code=429,
-        content={
-            "status": "FAILURE",
-            "error_code": "RATE_LIMIT_EXCEEDED",
-            "should_refund": False,
-            "technical_details": "Too many requests. Please try again later."
-        }
+        media_type="application/json"
     )
 
 def anonymize_ip(ip_address: str) -> str:
@@ -41,11 +45,11 @@ def anonymize_ip(ip_address: str) -> str:
 def get_user_identifier(request: Request):
     user_id = getattr(request.state, 'user_id', None)
     if user_id:
-        logger.info(f"Rate limiting by user_id: {user_id}")
+        logger.debug("Rate limiting by user_id: %s", user_id)
         return user_id
     else:
         ip_address = get_remote_address(request)
-        anonymized_ip = anonymize_ip(ip_address)
-        logger.info(f"Rate limiting by IP address: {anonymized_ip}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Rate limiting by IP address: %s", anonymize_ip(ip_address))
         return ip_address
 
@@ -1,3 +1,6 @@
+import time
+import hashlib
+from typing import Dict, Tuple
 from fastapi import Depends, status
 from fastapi.responses import JSONResponse
 from src.config import config
@@ -6,6 +9,12 @@ from jose import jwt, JWTError
 
 security = HTTPBearer()
 
+# Cache for successfully verified tokens: blake2b-128(token) -> (user_id, cache expiry)
+# Entries never outlive the token's own "exp" claim
+TOKEN_CACHE_TTL = 60  # seconds
+TOKEN_CACHE_MAX_SIZE = 1024
+_token_cache: Dict[bytes, Tuple[str, float]] = {}
+
 class TokenError(Exception):
     """Custom exception for token errors"""
     def __init__(self, error_code: str, technical_details: str):
@@ -24,6 +33,12 @@ def verify_token_sync(credentials: HTTPAuthorizationCredentials) -> str:
         )
 
     token = credentials.credentials
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+    cached = _token_cache.get(cache_key)
+    if cached and cached[1] > now:
+        return cached[0]
+
     try:
         # JWT verifizieren
         payload = jwt.decode(
@@ -38,6 +53,11 @@ def verify_token_sync(credentials: HTTPAuthorizationCredentials) -> str:
                 error_code="INVALID_TOKEN",
                 technical_details="Token does not contain user ID"
             )
+
+        if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+            # Drop the oldest entry (dicts keep insertion order)
+            _token_cache.pop(next(iter(_token_cache)), None)
+        _token_cache[cache_key] = (user_id, min(now + TOKEN_CACHE_TTL, payload.get("exp", now)))
         return user_id
     except jwt.ExpiredSignatureError:
         raise TokenError(
@@ -54,12 +74,16 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(secur
     """Async wrapper for JWT verification (for dependency injection)"""
     return verify_token_sync(credentials)
 
-async def get_user_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+async def get_user_token(
+    user_id: str = Depends(verify_token),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> str:
     """
     Extract the raw JWT token from the Authorization header
     Returns the token string for passing to Supabase client
+
+    Depends on verify_token, so FastAPI's per-request dependency cache
+    verifies the token only once when a route uses both dependencies
     """
-    # Verify token is valid first
-    verify_token_sync(credentials)
     # Return the raw token
     return credentials.credentials
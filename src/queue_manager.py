@@ -1,11 +1,10 @@
-import os
 import json
-import base64
 import logging
 import redis
 from typing import Dict, Any, Optional
 from datetime import datetime
 from celery.result import AsyncResult
+from src.config import config
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +17,8 @@ class QueueManager:
 
     def __init__(self):
         """Initialisiert Redis Connection und Celery"""
-        self.redis_client = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            db=int(os.getenv('REDIS_DB', 0)),
-            password=os.getenv('REDIS_PASSWORD'),
+        self.redis_client = redis.from_url(
+            config.redis_url,
             decode_responses=True
         )
 
@@ -32,8 +28,9 @@ class QueueManager:
         self.process_clothing_task = process_clothing_image
         
     def add_clothing_processing_job(self, clothing_id: str, user_id: str,
-                                  user_token: str, file_content: bytes, file_name: str,
-                                  content_type: str, priority: int = 0) -> Optional[str]:
+                                  user_token: str, original_path: str, file_name: str,
+                                  content_type: str, priority: int = 0,
+                                  cache_id: Optional[str] = None) -> Optional[str]:
         """
         Fügt einen Kleidungsstück-Verarbeitungsjob zur Celery Queue hinzu
 
@@ -41,21 +38,19 @@ class QueueManager:
             clothing_id: UUID des Kleidungsstücks
             user_id: UUID des Nutzers
             user_token: JWT token for authenticated storage access
-            file_content: Binäre Dateidaten
+            original_path: Pfad des bereits hochgeladenen Originalbildes im Storage
             file_name: Dateiname
             content_type: MIME-Type
             priority: Priorität (0-10, höher = wichtiger)
+            cache_id: Inhalts-Hash des Originalbildes für den Analyse-Cache
 
         Returns:
             Task ID wenn erfolgreich, None bei Fehler
         """
         try:
-            # File Content als Base64 kodieren
-            file_content_b64 = base64.b64encode(file_content).decode('utf-8')
-
-            # Celery Task starten
+            # Nur den Storage-Pfad übergeben - die Bilddaten bleiben aus Redis raus
             result = self.process_clothing_task.apply_async(
-                args=[clothing_id, user_id, user_token, file_content_b64, file_name, content_type],
+                args=[clothing_id, user_id, user_token, original_path, file_name, content_type, cache_id],
                 priority=priority,
                 retry=True,
                 retry_policy={
@@ -152,6 +147,9 @@ class QueueManager:
         """
         Holt den Status eines bestimmten Celery Tasks
 
+        Hinweis: Verarbeitungstasks speichern kein Ergebnis im Result Backend,
+        deren Status steht in clothes.processing_status.
+
         Args:
             task_id: Celery Task ID
 
@@ -2,10 +2,10 @@
 Synchronous Redis Publisher for Celery Tasks
 Publishes WebSocket updates from Celery worker (non-async context)
 """
-import json
 import logging
 from typing import Dict, Any
 from datetime import datetime
+import orjson
 import redis
 from src.config import config
 
@@ -36,7 +36,7 @@ class RedisPublisher:
                 "timestamp": datetime.utcnow().isoformat(),
                 **update_data
             }
-            self.redis_client.publish("clothing_updates", json.dumps(message))
+            self.redis_client.publish("clothing_updates", orjson.dumps(message))
             logger.debug(f"📡 Published update for clothing {clothing_id}: {update_data.get('type', 'unknown')}")
         except Exception as e:
             logger.error(f"❌ Failed to publish update for clothing {clothing_id}: {e}")
@@ -100,13 +100,14 @@ class RedisPublisher:
             }
         )
 
-    def publish_error(self, clothing_id: str, error: str):
+    def publish_error(self, clothing_id: str, error: str, final: bool = True):
         """
         Publish an error update
 
         Args:
             clothing_id: UUID of clothing item
             error: Error message
+            final: False if the task will be retried (more updates follow)
         """
         self.publish_update(
             clothing_id=clothing_id,
@@ -114,7 +115,8 @@ class RedisPublisher:
                 "type": "error",
                 "status": "failed",
                 "message": "Processing failed",
-                "error": error
+                "error": error,
+                "final": final
             }
         )
 
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import HTMLResponse, JSONResponse
@@ -38,7 +39,7 @@ def get_legal_document(doc_type: str, lang: str = "de") -> dict:
         )
 
     try:
-        content = file_path.read_text(encoding="utf-8")
+        content = _read_legal_file(file_path)
         return {
             "type": doc_type,
             "language": lang,
@@ -49,6 +50,12 @@ def get_legal_document(doc_type: str, lang: str = "de") -> dict:
         raise HTTPException(status_code=500, detail=f"Failed to read document: {str(e)}")
 
 
+@lru_cache(maxsize=None)
+def _read_legal_file(file_path: Path) -> str:
+    """Read a legal document once per process (documents only change on deploy)"""
+    return file_path.read_text(encoding="utf-8")
+
+
 def render_legal_html(doc: dict) -> str:
     """
     Render legal document as HTML page
@@ -59,7 +66,14 @@ def render_legal_html(doc: dict) -> str:
     Returns:
         HTML string
     """
-    html_content = markdown.markdown(doc["content"])
+    return _render_legal_html(doc["type"], doc["language"], doc["content"])
+
+
+@lru_cache(maxsize=None)
+def _render_legal_html(doc_type: str, language: str, content: str) -> str:
+    """Render the HTML page once per document and language (markdown conversion is the costly part)"""
+    doc = {"type": doc_type, "language": language}
+    html_content = markdown.markdown(content)
 
     # Map document types to titles and routes
     titles = {
@@ -6,9 +6,10 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import base64
+import hashlib
 import logging
 
-from src.database_manager import DatabaseManager, ProcessingStatus
+from src.database_manager import DatabaseManager, ProcessingStatus, get_anon_database_manager
 from src.storage_manager import StorageManager
 from src.queue_manager import QueueManager
 from src.ai import ClothingAI
@@ -51,7 +52,7 @@ class QueueStatsResponse(BaseModel):
 
 # Dependency: Get services
 def get_db_manager():
-    return DatabaseManager()
+    return get_anon_database_manager()
 
 
 def get_queue_manager():
@@ -84,8 +85,17 @@ async def upload_clothing(
         storage = StorageManager(user_token=user_token)
         db = DatabaseManager(user_token=user_token)
 
-        # Read file data
-        file_data = await file.read()
+        # Reject oversized uploads before buffering them in memory
+        if file.size is not None:
+            is_valid, error_msg = storage.validate_image_file(file.content_type, file.size)
+            if not is_valid:
+                raise HTTPException(
+                    status_code=400,
+                    detail=error_msg
+                )
+
+        # Read file data (never more than one byte past the size limit)
+        file_data = await file.read(StorageManager.MAX_FILE_SIZE + 1)
 
         # Validate image
         is_valid, error_msg = storage.validate_image_file(file.content_type, len(file_data))
@@ -105,16 +115,17 @@ async def upload_clothing(
         logger.info(f"Creating database entry...")
         clothing_id = db.create_pending_clothing_item(user_id, original_url)
 
-        # Queue for processing
+        # Queue for processing (content digest lets identical uploads reuse the AI analysis)
         logger.info(f"Queuing for AI processing...")
         task_id = queue.add_clothing_processing_job(
             clothing_id=clothing_id,
             user_id=user_id,
             user_token=user_token,
-            file_content=file_data,
+            original_path=file_path,
             file_name=file.filename,
             content_type=file.content_type,
-            priority=0
+            priority=0,
+            cache_id=hashlib.blake2b(file_data, digest_size=16).hexdigest()
         )
 
         return ClothingUploadResponse(
@@ -132,6 +143,8 @@ async def upload_clothing(
     except QueueError as e:
         logger.error(f"Queue error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Queue error: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -155,17 +168,12 @@ async def get_user_clothes(
     """
     try:
         db = DatabaseManager(user_token=user_token)
-        # Get all clothes for user
-        clothes = db.get_user_clothes(user_id)
-
-        # Apply filters
-        if status:
-            clothes = [c for c in clothes if c.get('processing_status') == status]
-
-        if category:
-            clothes = [c for c in clothes if c.get('category') == category]
-
-        return clothes
+        # Filters are applied in the database query, not on the full result
+        return db.get_user_clothes(
+            user_id,
+            category=category,
+            status=ProcessingStatus[status] if status else None
+        )
 
     except DatabaseError as e:
         logger.error(f"Database error: {str(e)}")
@@ -11,6 +11,9 @@ class StorageManager:
     StorageManager für Wardroberry App mit Supabase Storage
     Verwaltet Upload, Download und Validierung von Bilddateien
     """
+
+    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    MIN_FILE_SIZE = 1024  # 1KB
     
     def __init__(self, user_token: str):
         """
@@ -64,13 +67,11 @@ class StorageManager:
             return False, f"Dateityp nicht erlaubt. Erlaubt: {', '.join(allowed_types)}"
         
         # Dateigröße prüfen (10MB Maximum)
-        max_size = 10 * 1024 * 1024  # 10MB
-        if file_size > max_size:
-            return False, f"Datei zu groß. Maximum: {max_size // (1024*1024)}MB"
+        if file_size > self.MAX_FILE_SIZE:
+            return False, f"Datei zu groß. Maximum: {self.MAX_FILE_SIZE // (1024*1024)}MB"
         
         # Minimale Dateigröße
-        min_size = 1024  # 1KB
-        if file_size < min_size:
+        if file_size < self.MIN_FILE_SIZE:
             return False, "Datei zu klein"
         
         return True, ""
@@ -95,23 +96,7 @@ class StorageManager:
             unique_filename = f"{user_id}/{uuid4()}{file_extension}"
             
             # In Supabase Storage hochladen
-            self.client.storage.from_(self.original_bucket).upload(
-                path=unique_filename,
-                file=file_content,
-                file_options={
-                    "content-type": content_type
-                }
-            )
-
-            # Signierte URL generieren (für private Buckets, 1 Jahr gültig)
-            signed_url_response = self.client.storage.from_(self.original_bucket).create_signed_url(
-                path=unique_filename,
-                expires_in=31536000  # 1 Jahr in Sekunden
-            )
-            signed_url = signed_url_response.get('signedURL') if signed_url_response else None
-
-            if not signed_url:
-                raise Exception("Signierte URL konnte nicht erstellt werden")
+            signed_url = self._upload_and_sign(self.original_bucket, unique_filename, file_content, content_type)
 
             self.logger.info(f"Original-Bild hochgeladen: {unique_filename}")
             return unique_filename, signed_url
@@ -138,31 +123,82 @@ class StorageManager:
             file_extension = self._get_file_extension(content_type)
             unique_filename = f"{user_id}/{clothing_id}_processed{file_extension}"
             
-            self.client.storage.from_(self.processed_bucket).upload(
-                path=unique_filename,
-                file=file_content,
-                file_options={
-                    "content-type": content_type
-                }
+            # Fester Pfad pro Kleidungsstück: bei Task-Retries überschreiben statt "already exists"
+            signed_url = self._upload_and_sign(
+                self.processed_bucket, unique_filename, file_content, content_type, upsert=True
             )
 
-            # Signierte URL generieren (für private Buckets, 1 Jahr gültig)
-            signed_url_response = self.client.storage.from_(self.processed_bucket).create_signed_url(
-                path=unique_filename,
-                expires_in=31536000  # 1 Jahr in Sekunden
+            self.logger.info(f"Verarbeitetes Bild hochgeladen: {unique_filename}")
+            return unique_filename, signed_url
+            
+        except Exception as e:
+            self.logger.error(f"Fehler beim Hochladen des verarbeiteten Bildes: {e}")
+            raise
+    
+    def _upload_and_sign(self, bucket_name: str, file_path: str,
+                         file_content: bytes, content_type: str,
+                         upsert: bool = False) -> str:
+        """
+        Lädt eine Datei hoch und erstellt eine signierte URL dafür
+
+        Args:
+            bucket_name: Name des Storage Buckets
+            file_path: Zielpfad im Bucket
+            file_content: Binärdaten der Datei
+            content_type: MIME-Type
+            upsert: Vorhandene Datei am selben Pfad überschreiben
+
+        Returns:
+            Signierte URL (für private Buckets, 1 Jahr gültig)
+        """
+        bucket = self.client.storage.from_(bucket_name)
+        bucket.upload(
+            path=file_path,
+            file=file_content,
+            file_options={
+                "content-type": content_type,
+                "upsert": "true" if upsert else "false"
+            }
+        )
+
+        signed_url_response = bucket.create_signed_url(
+            path=file_path,
+            expires_in=31536000  # 1 Jahr in Sekunden
+        )
+        signed_url = signed_url_response.get('signedURL') if signed_url_response else None
+
+        if not signed_url:
+            raise Exception("Signierte URL konnte nicht erstellt werden")
+
+        return signed_url
+
+    def create_original_signed_url(self, file_path: str, expires_in: int = 600) -> str:
+        """
+        Erstellt eine kurzlebige signierte URL für ein originales Kleidungsbild
+
+        Args:
+            file_path: Pfad zur Datei im Original-Bucket
+            expires_in: Gültigkeit in Sekunden (Standard: 10 Minuten)
+
+        Returns:
+            Signierte URL
+        """
+        try:
+            signed_url_response = self.client.storage.from_(self.original_bucket).create_signed_url(
+                path=file_path,
+                expires_in=expires_in
             )
             signed_url = signed_url_response.get('signedURL') if signed_url_response else None
 
             if not signed_url:
                 raise Exception("Signierte URL konnte nicht erstellt werden")
 
-            self.logger.info(f"Verarbeitetes Bild hochgeladen: {unique_filename}")
-            return unique_filename, signed_url
-            
+            return signed_url
+
         except Exception as e:
-            self.logger.error(f"Fehler beim Hochladen des verarbeiteten Bildes: {e}")
+            self.logger.error(f"Fehler beim Signieren des Original-Bildes: {e}")
             raise
-    
+
     def delete_image(self, bucket_name: str, file_path: str) -> bool:
         """
         Löscht ein Bild aus Supabase Storage
@@ -3,15 +3,17 @@ Celery Tasks for Wardroberry API
 Async processing with Redis broker
 """
 import os
-import base64
 import logging
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+import orjson
 from celery import Celery
+from kombu.serialization import register
 from datetime import datetime
 
 from src.storage_manager import StorageManager
 from src.ai import ClothingAI
-from src.database_manager import DatabaseManager, ProcessingStatus
+from src.database_manager import DatabaseManager, get_anon_database_manager
 from src.config import config
 
 # Logging Setup
@@ -21,27 +23,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# orjson serializer for task messages and results (faster than stdlib json)
+register(
+    'orjson',
+    orjson.dumps,
+    orjson.loads,
+    content_type='application/x-orjson',
+    content_encoding='utf-8'
+)
+
 # Celery App Configuration
 celery_app = Celery(
     'wardroberry',
-    broker=config.redis_url,
-    backend=config.redis_url
+    broker=config.celery_redis_url,
+    backend=config.celery_redis_url
 )
 
 # Celery Configuration
 celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    task_serializer='orjson',
+    accept_content=['orjson', 'json'],  # json kept for messages queued before the switch
+    result_serializer='orjson',
     timezone='UTC',
     enable_utc=True,
-    task_track_started=True,
+    task_track_started=False,  # Progress is published via Redis Pub/Sub instead
+    task_ignore_result=True,  # Results live in the database; tasks opt in if needed
+    result_expires=3600,  # 1 hour
     task_time_limit=300,  # 5 minutes max per task
     task_soft_time_limit=240,  # 4 minutes soft limit
     task_acks_late=False,  # Acknowledge immediately (changed from True)
     worker_prefetch_multiplier=4,  # Prefetch multiple tasks (changed from 1)
     task_default_retry_delay=60,  # 1 minute retry delay
     task_max_retries=3,
+    task_routes={
+        # Long-running image processing gets its own queue so it can't starve health checks
+        'wardroberry.process_clothing_image': {'queue': 'clothing'},
+    },
+    broker_transport_options={
+        'visibility_timeout': 43200,  # 12 hours
+        'socket_keepalive': True,
+        'health_check_interval': 30,
+    },
     worker_log_format='[%(asctime)s: %(levelname)s/%(processName)s] %(message)s',
     worker_task_log_format='[%(asctime)s: %(levelname)s/%(processName)s][%(task_name)s(%(task_id)s)] %(message)s',
 )
@@ -53,9 +75,10 @@ def process_clothing_image(
     clothing_id: str,
     user_id: str,
     user_token: str,
-    file_content_b64: str,
+    original_path: str,
     file_name: str,
-    content_type: str
+    content_type: str,
+    cache_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Celery Task: Process clothing image with AI analysis
@@ -66,9 +89,10 @@ def process_clothing_image(
         clothing_id: UUID of clothing item
         user_id: UUID of user
         user_token: JWT token for authenticated storage access
-        file_content_b64: Base64-encoded file content
+        original_path: Storage path of the uploaded original image
         file_name: Original filename
         content_type: MIME type
+        cache_id: Content digest of the original upload, keys the AI analysis cache
 
     Returns:
         Dict with processing results
@@ -77,6 +101,7 @@ def process_clothing_image(
 
     # Initialize Redis publisher for WebSocket updates
     publisher = RedisPublisher()
+    db = None
 
     try:
         logger.info(f"🔄 Starting processing for clothing: {clothing_id}")
@@ -89,32 +114,44 @@ def process_clothing_image(
         # Total steps for progress tracking
         TOTAL_STEPS = 4
 
-        # Step 1: Update status to processing
+        # Step 1: Update status to processing (skip duplicate deliveries of finished items)
+        if not db.claim_clothing_for_processing(clothing_id):
+            logger.info(f"⏭️ Skipping {clothing_id}: already processed")
+            return {
+                'success': True,
+                'clothing_id': clothing_id,
+                'skipped': True
+            }
         publisher.publish_progress(clothing_id, 1, TOTAL_STEPS, "Starting image processing...")
-        db.update_processing_status(clothing_id, ProcessingStatus.PROCESSING)
 
-        # Decode file content
-        file_content = base64.b64decode(file_content_b64)
+        # Short-lived signed URL: OpenAI fetches the original itself instead of us downloading and inlining it
+        original_url = storage.create_original_signed_url(original_path)
 
         # Step 2: Extract clothing from background
         logger.info("🖼️ Extracting clothing from background...")
         publisher.publish_progress(clothing_id, 2, TOTAL_STEPS, "Extracting clothing from background...")
-        extracted_image_bytes = ai.extract_clothing(file_content)
-
-        # Step 3: Upload extracted image
-        logger.info("📤 Uploading processed image...")
-        publisher.publish_progress(clothing_id, 3, TOTAL_STEPS, "Uploading processed image...")
-        extracted_path, extracted_url = storage.upload_processed_image(
-            user_id=user_id,
-            clothing_id=clothing_id,
-            file_content=extracted_image_bytes,
-            content_type=content_type
-        )
-
-        # Step 4: AI Analysis
-        logger.info("🤖 Performing AI analysis...")
-        publisher.publish_progress(clothing_id, 4, TOTAL_STEPS, "Analyzing clothing with AI...")
-        ai_analysis = ai.analyze_clothing_image(extracted_image_bytes)
+        extracted_image_bytes = ai.extract_clothing(original_url)
+
+        # Steps 3 + 4 are independent network waits: upload in the background while analyzing
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Step 3: Upload extracted image
+            logger.info("📤 Uploading processed image...")
+            publisher.publish_progress(clothing_id, 3, TOTAL_STEPS, "Uploading processed image...")
+            upload_future = executor.submit(
+                storage.upload_processed_image,
+                user_id=user_id,
+                clothing_id=clothing_id,
+                file_content=extracted_image_bytes,
+                content_type=content_type
+            )
+
+            # Step 4: AI Analysis
+            logger.info("🤖 Performing AI analysis...")
+            publisher.publish_progress(clothing_id, 4, TOTAL_STEPS, "Analyzing clothing with AI...")
+            # Cached by the original upload's content: re-uploads and retries skip a second analysis
+            ai_analysis = ai.analyze_clothing_image(extracted_image_bytes, cache_id=cache_id)
+
+            extracted_path, extracted_url = upload_future.result()
 
         # Mark as completed in database
         completed_item = db.complete_clothing_processing(
@@ -147,29 +184,27 @@ def process_clothing_image(
         }
         publisher.publish_completion(clothing_id, result)
 
-        # Cleanup
-        publisher.close()
-
         return {
             'success': True,
             **result
         }
 
     except Exception as e:
-        logger.error(f"❌ Error processing {clothing_id}: {e}")
-
-        # Send error notification via WebSocket
-        publisher.publish_error(clothing_id, str(e))
-
-        # Mark as failed in database
-        try:
-            db = DatabaseManager(user_token=user_token)
-            db.mark_processing_failed(clothing_id, str(e))
-        except Exception as db_error:
-            logger.error(f"❌ Additional DB error: {db_error}")
-
-        # Cleanup
-        publisher.close()
+        error_message = str(e)
+        logger.error(f"❌ Error processing {clothing_id}: {error_message}")
+
+        # Send error notification via WebSocket (not final while retries remain)
+        final_attempt = self.request.retries >= self.max_retries
+        publisher.publish_error(clothing_id, error_message, final=final_attempt)
+
+        # Mark as failed in database only after the last attempt; while a retry is
+        # pending the item stays "processing" (reuse the client if it was already created)
+        if final_attempt:
+            try:
+                db = db or DatabaseManager(user_token=user_token)
+                db.mark_processing_failed(clothing_id, error_message)
+            except Exception as db_error:
+                logger.error(f"❌ Additional DB error: {db_error}")
 
         # Retry the task (max 3 times with exponential backoff)
         try:
@@ -179,12 +214,15 @@ def process_clothing_image(
             return {
                 'success': False,
                 'clothing_id': clothing_id,
-                'error': str(e),
+                'error': error_message,
                 'failed_at': datetime.utcnow().isoformat()
             }
+    finally:
+        # Cleanup: always release the Redis connection, also on retry
+        publisher.close()
 
 
-@celery_app.task(name='wardroberry.health_check')
+@celery_app.task(name='wardroberry.health_check', ignore_result=False)
 def health_check_task() -> Dict[str, bool]:
     """
     Celery Task: Health check for all services
@@ -194,7 +232,7 @@ def health_check_task() -> Dict[str, bool]:
     """
     try:
         ai = ClothingAI()
-        db = DatabaseManager()
+        db = get_anon_database_manager()
 
         return {
             'celery': True,
@@ -2,10 +2,10 @@
 WebSocket Manager for real-time clothing processing updates
 Handles WebSocket connections and Redis pub/sub for processing status updates
 """
-import json
 import asyncio
 import logging
 from typing import Dict, Set, Optional, Any
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
 import redis.asyncio as redis
 from datetime import datetime
@@ -103,23 +103,31 @@ class ClothingWebSocketManager:
                 "timestamp": datetime.utcnow().isoformat(),
                 **update_data
             }
-            await self.redis_client.publish("clothing_updates", json.dumps(message))
+            await self.redis_client.publish("clothing_updates", orjson.dumps(message))
             logger.debug(f"📡 Published update for clothing {clothing_id}: {update_data.get('type', 'unknown')}")
         except Exception as e:
             logger.error(f"❌ Failed to publish update for clothing {clothing_id}: {e}")
 
-    async def broadcast_to_clothing(self, clothing_id: str, message: Dict[str, Any]):
-        """Broadcast a message to all WebSockets connected to a clothing item"""
+    async def broadcast_to_clothing(self, clothing_id: str, message: Dict[str, Any], raw_message: Optional[str] = None):
+        """
+        Broadcast a message to all WebSockets connected to a clothing item
+
+        Args:
+            clothing_id: UUID of clothing item
+            message: Parsed message
+            raw_message: Already serialized JSON of the message (serialized once here if omitted)
+        """
         if clothing_id not in self.connections:
             logger.debug(f"No active connections for clothing {clothing_id}")
             return
 
         disconnected = set()
         success_count = 0
+        text = raw_message if raw_message is not None else orjson.dumps(message).decode()
 
         for websocket in self.connections[clothing_id].copy():
             try:
-                await websocket.send_json(message)
+                await websocket.send_text(text)
                 success_count += 1
             except WebSocketDisconnect:
                 disconnected.add(websocket)
@@ -127,16 +135,37 @@ class ClothingWebSocketManager:
                 logger.error(f"❌ Error sending to WebSocket: {e}")
                 disconnected.add(websocket)
 
-        # Clean up disconnected websockets
-        for websocket in disconnected:
-            self.connections[clothing_id].discard(websocket)
+        # Clean up disconnected websockets (the set may already be gone after awaiting sends)
+        sockets = self.connections.get(clothing_id)
+        if sockets is not None:
+            sockets.difference_update(disconnected)
 
-        if not self.connections[clothing_id]:
+        # Terminal update: close the sockets instead of leaving clients connected.
+        # Take them out first, disconnect() from the endpoints runs while close() is awaited
+        if self._is_terminal_message(message):
+            for websocket in self.connections.pop(clothing_id, set()):
+                try:
+                    await websocket.close(code=1000, reason="Processing finished")
+                except Exception as e:
+                    logger.debug(f"WebSocket already closed for clothing {clothing_id}: {e}")
+        elif sockets is not None and not sockets and self.connections.get(clothing_id) is sockets:
             del self.connections[clothing_id]
 
         if success_count > 0:
             logger.debug(f"📤 Broadcast to {success_count} clients for clothing {clothing_id}")
 
+    @staticmethod
+    def _is_terminal_message(message: Dict[str, Any]) -> bool:
+        """
+        Check whether no further updates follow for a clothing item
+
+        "completed" is always final; "error" only once the task will not be retried
+        """
+        message_type = message.get('type')
+        if message_type == "completed":
+            return True
+        return message_type == "error" and message.get('final', True)
+
     async def listen_for_updates(self):
         """Listen for Redis pub/sub messages and broadcast to WebSockets"""
         if not self.pubsub:
@@ -148,11 +177,14 @@ class ClothingWebSocketManager:
             async for message in self.pubsub.listen():
                 if message['type'] == 'message':
                     try:
-                        data = json.loads(message['data'])
+                        data = orjson.loads(message['data'])
                         clothing_id = data.get('clothing_id')
                         if clothing_id:
-                            await self.broadcast_to_clothing(clothing_id, data)
-                    except json.JSONDecodeError:
+                            # Forward the published JSON as-is instead of re-serializing per socket
+                            raw = message['data']
+                            raw = raw.decode() if isinstance(raw, bytes) else raw
+                            await self.broadcast_to_clothing(clothing_id, data, raw)
+                    except orjson.JSONDecodeError:
                         logger.error("❌ Invalid JSON in Redis message")
                     except Exception as e:
                         logger.error(f"❌ Error processing Redis message: {e}")
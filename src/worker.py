@@ -10,6 +10,7 @@ Usage:
 from gevent import monkey
 monkey.patch_all()
 
+import os
 import sys
 import logging
 
@@ -19,12 +20,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Tasks are I/O-bound (OpenAI, Supabase), so one process with many greenlets
+WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', '20'))
+
 
 def main():
     """
     Starts Celery worker with gevent pool
     """
-    print("""
+    print(f"""
     🧥 Wardroberry Celery Worker (gevent)
     ========================================
 
@@ -34,7 +38,8 @@ def main():
     - Database updates
 
     Pool: gevent (async I/O)
-    Concurrency: 20 greenlets
+    Concurrency: {WORKER_CONCURRENCY} greenlets
+    Queues: clothing, celery
 
     Press Ctrl+C to stop.
     """)
@@ -49,7 +54,8 @@ def main():
             'worker',
             '--loglevel=info',
             '--pool=gevent',
-            '--concurrency=20',
+            f'--concurrency={WORKER_CONCURRENCY}',
+            '--queues=clothing,celery',
         ])
 
     except ImportError as e:
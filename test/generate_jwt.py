@@ -2,6 +2,10 @@
 import jwt
 import time
 import uuid
+import hmac
+import json
+import base64
+import hashlib
 from dotenv import load_dotenv
 import os
 
@@ -9,31 +13,62 @@ load_dotenv()
 # === DEINE SUPABASE DATEN ===
 SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET')
 
+# Konstante Claims für User JWTs (wird pro Token nur kopiert)
+USER_PAYLOAD_TEMPLATE = {
+    "role": "authenticated",    # WICHTIG für RLS
+    "aud": "authenticated",
+    "iss": "supabase",
+}
+
 # === FUNKTION: JWT für normalen User ===
 def generate_user_jwt(user_id=None, email="test@example.com"):
     if user_id is None:
         user_id = str(uuid.uuid4())  # Zufällige UUID
 
-    payload = {
-        "sub": user_id,
-        "email": email,
-        "role": "authenticated",    # WICHTIG für RLS
-        "aud": "authenticated",
-        "iss": "supabase",
-        "iat": int(time.time()),
-        "exp": int(time.time()) + 3600  # 1 Stunde gültig
-    }
+    now = int(time.time())
+    payload = USER_PAYLOAD_TEMPLATE.copy()
+    payload.update(sub=user_id, email=email, iat=now, exp=now + 3600)  # 1 Stunde gültig
 
     token = jwt.encode(payload, SUPABASE_JWT_SECRET, algorithm="HS256")
     return token
 
+# === FUNKTION: Viele User JWTs auf einmal (z.B. für Lasttests) ===
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def generate_user_jwts(count, email="test@example.com"):
+    # Konstanten einmal berechnen statt pro Token
+    header_b64 = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+    # HMAC-Key einmal vorbereiten, pro Token nur den Zustand kopieren
+    base_mac = hmac.new(SUPABASE_JWT_SECRET.encode(), digestmod=hashlib.sha256)
+    now = int(time.time())
+    # Zufallsbytes für alle UUIDs mit einem Syscall holen
+    random_bytes = os.urandom(16 * count)
+
+    tokens = []
+    for i in range(count):
+        payload = USER_PAYLOAD_TEMPLATE.copy()
+        payload.update(
+            sub=str(uuid.UUID(bytes=random_bytes[i * 16:(i + 1) * 16], version=4)),
+            email=email,
+            iat=now,
+            exp=now + 3600
+        )
+        signing_input = header_b64 + b"." + _b64url(json.dumps(payload, separators=(",", ":")).encode())
+        mac = base_mac.copy()
+        mac.update(signing_input)
+        signature = mac.digest()
+        tokens.append((signing_input + b"." + _b64url(signature)).decode())
+    return tokens
+
 # === FUNKTION: JWT für Admin (service_role) ===
 def generate_service_jwt():
+    now = int(time.time())
     payload = {
         "role": "service_role",     # Admin-Rechte
         "iss": "supabase",
-        "iat": int(time.time()),
-        "exp": int(time.time()) + 3600
+        "iat": now,
+        "exp": now + 3600
     }
     return jwt.encode(payload, SUPABASE_JWT_SECRET, algorithm="HS256")
 